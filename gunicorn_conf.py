@@ -0,0 +1,19 @@
+"""
+Gunicorn configuration for serving the Mergington High School API
+
+Run from the repository root with:
+
+    gunicorn -c gunicorn_conf.py src.app:app
+"""
+
+import os
+
+# Activity data is kept in memory, so every worker process has its own copy
+# and signups made through one worker are not seen by the others. Keep a
+# single worker unless WEB_CONCURRENCY is set explicitly, e.g. to
+# max(2, os.cpu_count()) once the data lives in shared storage.
+workers = int(os.environ.get("WEB_CONCURRENCY", 1))
+# UvicornWorker uses uvloop automatically when it is installed
+worker_class = "uvicorn.workers.UvicornWorker"
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+keepalive = 75
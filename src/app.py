@@ -5,22 +5,62 @@ A super simple FastAPI application that allows students to view and sign up
 for extracurricular activities at Mergington High School.
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import RedirectResponse
-import os
+from fastapi.responses import RedirectResponse, Response
+from collections import defaultdict
+from collections.abc import Mapping
+from dataclasses import dataclass
+import hashlib
+import orjson
 from pathlib import Path
+import sys
+from types import MappingProxyType
+from pydantic import BaseModel, EmailStr
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles that lets browsers cache the frontend assets"""
+
+    def file_response(self, *args, **kwargs) -> Response:
+        response = super().file_response(*args, **kwargs)
+        response.headers.setdefault("Cache-Control", "public, max-age=3600")
+        return response
+
 
 app = FastAPI(title="Mergington High School API",
               description="API for viewing and signing up for extracurricular activities")
 
+# Compress larger responses such as GET /activities
+app.add_middleware(GZipMiddleware, minimum_size=500)
+
 # Mount the static files directory
-current_dir = Path(__file__).parent
-app.mount("/static", StaticFiles(directory=os.path.join(Path(__file__).parent,
-          "static")), name="static")
+STATIC_DIR = str(Path(__file__).parent / "static")
+app.mount("/static", CachedStaticFiles(directory=STATIC_DIR, html=True), name="static")
+
 
-# In-memory activity database
-activities = {
+@dataclass(frozen=True, slots=True)
+class ActivityMeta:
+    """The parts of an activity that never change at runtime"""
+    description: str
+    schedule: str
+    max_participants: int
+
+
+@dataclass(slots=True)
+class Roster:
+    """The students signed up for an activity
+
+    `participants` answers membership checks; `participant_list` keeps signup
+    order and is what GET /activities returns.
+    """
+    participants: set[str]
+    participant_list: list[str]
+
+
+# Initial activity data
+_INITIAL_ACTIVITIES = {
     "Soccer Team": {
         "description": "Join our varsity soccer team and compete in regional tournaments",
         "schedule": "Mondays and Wednesdays, 4:00 PM - 6:00 PM",
@@ -77,50 +117,193 @@ activities = {
     }
 }
 
+# In-memory activity database. Activity metadata is fixed at startup, so it
+# lives in a read-only table keyed by interned names; only the rosters are
+# mutated.
+ACTIVITY_META: Mapping[str, ActivityMeta] = MappingProxyType({
+    sys.intern(name): ActivityMeta(
+        description=details["description"],
+        schedule=details["schedule"],
+        max_participants=details["max_participants"],
+    )
+    for name, details in _INITIAL_ACTIVITIES.items()
+})
+ROSTERS: dict[str, Roster] = {
+    name: Roster(participants=set(details["participants"]),
+                 participant_list=list(details["participants"]))
+    for name, details in _INITIAL_ACTIVITIES.items()
+}
+
+# Reverse index of the activities each student is signed up for
+email_to_activities: defaultdict[str, set[str]] = defaultdict(set)
+
+
+def rebuild_student_index():
+    """Rebuild `email_to_activities` from the activity rosters"""
+    email_to_activities.clear()
+    for name, roster in ROSTERS.items():
+        for email in roster.participants:
+            email_to_activities[email].add(name)
+
+
+rebuild_student_index()
+
+# Prebuilt GET /activities body, re-encoded whenever the data changes. Only the
+# bytes and the ETag are shared: middleware such as GZip edits response
+# headers in place, so each request gets its own Response wrapper.
+# Any code that mutates the rosters must call `invalidate_activities_cache()`
+_activities_etag: str
+_FROZEN_BODY: bytes
+
+
+def _rebuild_activities_body():
+    """Encode the current activities into the prebuilt body"""
+    global _activities_etag, _FROZEN_BODY
+    _FROZEN_BODY = orjson.dumps({
+        name: {
+            "description": meta.description,
+            "schedule": meta.schedule,
+            "max_participants": meta.max_participants,
+            "participants": ROSTERS[name].participant_list,
+        }
+        for name, meta in ACTIVITY_META.items()
+    })
+    # Derive the ETag from the body itself so it stays valid across restarts
+    # and worker processes
+    _activities_etag = f'W/"{hashlib.blake2b(_FROZEN_BODY, digest_size=8).hexdigest()}"'
+
+
+def _etag_matches(if_none_match: str | None) -> bool:
+    """Check an If-None-Match header against the current activities ETag
+
+    Uses the weak comparison required for If-None-Match, accepting `*` and
+    comma-separated lists of tags.
+    """
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    current = _activities_etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == current
+               for tag in if_none_match.split(","))
+
+
+def invalidate_activities_cache():
+    """Rebuild the activities body after the data has changed"""
+    _rebuild_activities_body()
+
+
+_rebuild_activities_body()
+
+
+def _do_signup(activity_name: str, meta: ActivityMeta, email: str) -> bool:
+    """Add a student to an activity, returning False if already signed up
+
+    Raises a 409 if the activity is full. Callers are responsible for
+    invalidating the activities cache.
+    """
+    roster = ROSTERS[activity_name]
+    if email in roster.participants:
+        return False
+
+    if len(roster.participants) >= meta.max_participants:
+        raise HTTPException(status_code=409, detail="Activity full")
+
+    roster.participants.add(email)
+    roster.participant_list.append(email)
+    email_to_activities[email].add(activity_name)
+    return True
+
+
+class BatchSignup(BaseModel):
+    emails: list[EmailStr]
+
+
+# The landing page redirect never changes, so build it once
+_ROOT_REDIRECT = RedirectResponse(url="/static/index.html", status_code=307)
+
 
 @app.get("/")
 def root():
-    return RedirectResponse(url="/static/index.html")
+    return _ROOT_REDIRECT
 
 
 @app.get("/activities")
-def get_activities():
-    return activities
+async def get_activities(request: Request):
+    if _etag_matches(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers={"ETag": _activities_etag})
+    return Response(content=_FROZEN_BODY, media_type="application/json",
+                    headers={"ETag": _activities_etag})
 
 
 @app.post("/activities/{activity_name}/signup")
-def signup_for_activity(activity_name: str, email: str):
+async def signup_for_activity(activity_name: str, email: EmailStr) -> dict[str, str]:
     """Sign up a student for an activity"""
     # Validate activity exists
-    if activity_name not in activities:
+    meta = ACTIVITY_META.get(activity_name)
+    if meta is None:
         raise HTTPException(status_code=404, detail="Activity not found")
 
-    # Get the specific activity
-    activity = activities[activity_name]
-
-    # Validate student is not already signed up
-    if email in activity["participants"]:
+    # Add student, unless already signed up or the activity is full
+    if not _do_signup(activity_name, meta, email):
         raise HTTPException(status_code=400, detail="Student already signed up for this activity")
 
-    # Add student
-    activity["participants"].append(email)
+    invalidate_activities_cache()
     return {"message": f"Signed up {email} for {activity_name}"}
 
 
+@app.post("/activities/{activity_name}/signup:batch")
+async def batch_signup_for_activity(activity_name: str,
+                                    batch: BatchSignup) -> dict[str, list[str]]:
+    """Sign up several students for an activity in one request"""
+    # Validate activity exists
+    meta = ACTIVITY_META.get(activity_name)
+    if meta is None:
+        raise HTTPException(status_code=404, detail="Activity not found")
+
+    # Reject the whole batch up front if it does not fit, so it is never
+    # applied partially
+    participants = ROSTERS[activity_name].participants
+    new_emails = set(batch.emails) - participants
+    if len(participants) + len(new_emails) > meta.max_participants:
+        raise HTTPException(status_code=409, detail="Activity full")
+
+    added = []
+    already_registered = []
+    for email in batch.emails:
+        if _do_signup(activity_name, meta, email):
+            added.append(email)
+        else:
+            already_registered.append(email)
+
+    if added:
+        invalidate_activities_cache()
+    return {"added": added, "already_registered": already_registered}
+
+
 @app.delete("/activities/{activity_name}/unregister")
-def unregister_from_activity(activity_name: str, email: str):
+async def unregister_from_activity(activity_name: str, email: EmailStr) -> dict[str, str]:
     """Unregister a student from an activity"""
     # Validate activity exists
-    if activity_name not in activities:
+    roster = ROSTERS.get(activity_name)
+    if roster is None:
         raise HTTPException(status_code=404, detail="Activity not found")
 
-    # Get the specific activity
-    activity = activities[activity_name]
+    # Remove student, validating they were signed up
+    try:
+        roster.participants.remove(email)
+    except KeyError:
+        raise HTTPException(status_code=400, detail="Student is not signed up for this activity") from None
+    roster.participant_list.remove(email)
+    student_activities = email_to_activities[email]
+    student_activities.discard(activity_name)
+    if not student_activities:
+        del email_to_activities[email]
+    invalidate_activities_cache()
+    return {"message": f"Unregistered {email} from {activity_name}"}
 
-    # Validate student is signed up
-    if email not in activity["participants"]:
-        raise HTTPException(status_code=400, detail="Student is not signed up for this activity")
 
-    # Remove student
-    activity["participants"].remove(email)
-    return {"message": f"Unregistered {email} from {activity_name}"}
+@app.get("/students/{email}/activities")
+async def get_student_activities(email: EmailStr) -> list[str]:
+    """List the activities a student is signed up for"""
+    return sorted(email_to_activities.get(email, ()))
@@ -2,36 +2,49 @@
 Tests for the Mergington High School API
 """
 
+import asyncio
+import copy
+
+import httpx
 import pytest
+import pytest_asyncio
 from fastapi.testclient import TestClient
-from src.app import app, activities
+from src.app import (
+    app,
+    ACTIVITY_META,
+    ROSTERS,
+    invalidate_activities_cache,
+    rebuild_student_index,
+)
+
+# Snapshot of the initial participants, taken once before any test runs
+_ORIGINAL_ROSTERS = copy.deepcopy(ROSTERS)
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def client():
     """Create a test client for the FastAPI app"""
     return TestClient(app)
 
 
+@pytest_asyncio.fixture
+async def async_client():
+    """Create an async client so independent requests can run concurrently"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+
+
 @pytest.fixture(autouse=True)
 def reset_activities():
-    """Reset activities data before each test"""
-    # Store original state
-    original_activities = {
-        name: {
-            "description": details["description"],
-            "schedule": details["schedule"],
-            "max_participants": details["max_participants"],
-            "participants": details["participants"].copy()
-        }
-        for name, details in activities.items()
-    }
-    
+    """Reset activities data after each test"""
     yield
-    
+
     # Restore original state after test
-    for name in activities:
-        activities[name]["participants"] = original_activities[name]["participants"].copy()
+    for name, roster in _ORIGINAL_ROSTERS.items():
+        ROSTERS[name] = copy.deepcopy(roster)
+    rebuild_student_index()
+    invalidate_activities_cache()
 
 
 class TestRootEndpoint:
@@ -43,6 +56,13 @@ class TestRootEndpoint:
         assert response.status_code == 307
         assert response.headers["location"] == "/static/index.html"
 
+    def test_static_directory_serves_index(self, client):
+        """Test that /static/ serves index.html with cache headers"""
+        response = client.get("/static/")
+        assert response.status_code == 200
+        assert "text/html" in response.headers["content-type"]
+        assert response.headers["cache-control"] == "public, max-age=3600"
+
 
 class TestActivitiesEndpoint:
     """Tests for the activities endpoint"""
@@ -66,6 +86,57 @@ class TestActivitiesEndpoint:
         assert "participants" in soccer
         assert isinstance(soccer["participants"], list)
 
+    def test_get_activities_gzip(self, client):
+        """Test that the activities response is compressed when accepted"""
+        response = client.get("/activities", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Soccer Team" in response.json()
+
+    def test_get_activities_identity_after_gzip(self, client):
+        """Test that a gzip response does not leak into later uncompressed ones"""
+        client.get("/activities", headers={"Accept-Encoding": "gzip"})
+
+        response = client.get("/activities", headers={"Accept-Encoding": "identity"})
+        assert response.status_code == 200
+        assert "content-encoding" not in response.headers
+        assert int(response.headers["content-length"]) == len(response.content)
+        assert "Soccer Team" in response.json()
+
+    def test_get_activities_not_modified(self, client):
+        """Test that a matching If-None-Match returns 304 until data changes"""
+        etag = client.get("/activities").headers["etag"]
+
+        response = client.get("/activities", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+
+        # A signup changes the data, so the old ETag no longer matches
+        client.post("/activities/Soccer%20Team/signup?email=etag@mergington.edu")
+        response = client.get("/activities", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+
+    def test_get_activities_not_modified_tag_list(self, client):
+        """Test that If-None-Match matches within a list of tags and on *"""
+        etag = client.get("/activities").headers["etag"]
+
+        response = client.get("/activities", headers={"If-None-Match": f'"other", {etag}'})
+        assert response.status_code == 304
+
+        response = client.get("/activities", headers={"If-None-Match": "*"})
+        assert response.status_code == 304
+
+    def test_get_activities_etag_follows_content(self, client):
+        """Test that the ETag depends on the data, not on how often it changed"""
+        etag = client.get("/activities").headers["etag"]
+
+        # Signing up and unregistering again restores the same data
+        client.post("/activities/Soccer%20Team/signup?email=roundtrip@mergington.edu")
+        client.delete("/activities/Soccer%20Team/unregister?email=roundtrip@mergington.edu")
+        assert client.get("/activities").headers["etag"] == etag
+
 
 class TestSignupEndpoint:
     """Tests for the signup endpoint"""
@@ -110,29 +181,101 @@ class TestSignupEndpoint:
         data = response.json()
         assert "not found" in data["detail"].lower()
     
-    def test_signup_multiple_different_activities(self, client):
+    def test_signup_activity_full(self, client):
+        """Test that signup fails once an activity reaches max_participants"""
+        max_participants = ACTIVITY_META["Chess Club"].max_participants
+        for i in range(max_participants - len(ROSTERS["Chess Club"].participants)):
+            response = client.post(f"/activities/Chess%20Club/signup?email=full{i}@mergington.edu")
+            assert response.status_code == 200
+
+        response = client.post("/activities/Chess%20Club/signup?email=late@mergington.edu")
+        assert response.status_code == 409
+        assert "full" in response.json()["detail"].lower()
+
+        participants = client.get("/activities").json()["Chess Club"]["participants"]
+        assert len(participants) == max_participants
+        assert "late@mergington.edu" not in participants
+
+    def test_signup_invalid_email(self, client):
+        """Test that a malformed email is rejected before signup"""
+        response = client.post(
+            "/activities/Soccer%20Team/signup?email=notanemail"
+        )
+        assert response.status_code == 422
+
+        activities_data = client.get("/activities").json()
+        assert "notanemail" not in activities_data["Soccer Team"]["participants"]
+
+    @pytest.mark.asyncio
+    async def test_signup_multiple_different_activities(self, async_client):
         """Test signing up for multiple different activities"""
         email = "multisport@mergington.edu"
-        
-        # Sign up for Soccer Team
-        response1 = client.post(
-            f"/activities/Soccer%20Team/signup?email={email}"
+
+        # Sign up for Soccer Team and Basketball Club concurrently
+        response1, response2 = await asyncio.gather(
+            async_client.post(f"/activities/Soccer%20Team/signup?email={email}"),
+            async_client.post(f"/activities/Basketball%20Club/signup?email={email}"),
         )
         assert response1.status_code == 200
-        
-        # Sign up for Basketball Club
-        response2 = client.post(
-            f"/activities/Basketball%20Club/signup?email={email}"
-        )
         assert response2.status_code == 200
-        
+
         # Verify both signups
-        activities_response = client.get("/activities")
+        activities_response = await async_client.get("/activities")
         activities_data = activities_response.json()
         assert email in activities_data["Soccer Team"]["participants"]
         assert email in activities_data["Basketball Club"]["participants"]
 
 
+class TestBatchSignupEndpoint:
+    """Tests for the batch signup endpoint"""
+
+    def test_batch_signup(self, client):
+        """Test signing up new and existing students in one request"""
+        response = client.post(
+            "/activities/Chess%20Club/signup:batch",
+            json={"emails": ["batch1@mergington.edu", "michael@mergington.edu",
+                             "batch2@mergington.edu"]}
+        )
+        assert response.status_code == 200
+        assert response.json() == {
+            "added": ["batch1@mergington.edu", "batch2@mergington.edu"],
+            "already_registered": ["michael@mergington.edu"],
+        }
+
+        participants = client.get("/activities").json()["Chess Club"]["participants"]
+        assert "batch1@mergington.edu" in participants
+        assert "batch2@mergington.edu" in participants
+
+    def test_batch_signup_nonexistent_activity(self, client):
+        """Test batch signup for a non-existent activity"""
+        response = client.post(
+            "/activities/NonExistent%20Club/signup:batch",
+            json={"emails": ["test@mergington.edu"]}
+        )
+        assert response.status_code == 404
+
+    def test_batch_signup_activity_full(self, client):
+        """Test that a batch that does not fit is rejected as a whole"""
+        spots_left = ACTIVITY_META["Chess Club"].max_participants - len(ROSTERS["Chess Club"].participants)
+        emails = [f"batch{i}@mergington.edu" for i in range(spots_left + 1)]
+        response = client.post("/activities/Chess%20Club/signup:batch", json={"emails": emails})
+        assert response.status_code == 409
+
+        participants = client.get("/activities").json()["Chess Club"]["participants"]
+        assert not set(emails) & set(participants)
+
+    def test_batch_signup_invalid_email(self, client):
+        """Test that one malformed email rejects the whole batch"""
+        response = client.post(
+            "/activities/Chess%20Club/signup:batch",
+            json={"emails": ["valid@mergington.edu", "notanemail"]}
+        )
+        assert response.status_code == 422
+
+        participants = client.get("/activities").json()["Chess Club"]["participants"]
+        assert "valid@mergington.edu" not in participants
+
+
 class TestUnregisterEndpoint:
     """Tests for the unregister endpoint"""
     
@@ -212,21 +355,28 @@ class TestUnregisterEndpoint:
 class TestDataIntegrity:
     """Tests for data integrity and edge cases"""
     
-    def test_participants_are_independent(self, client):
+    @pytest.mark.asyncio
+    async def test_participants_are_independent(self, async_client):
         """Test that participant lists are independent across activities"""
         email = "independent@mergington.edu"
-        
-        # Sign up for Soccer Team
-        client.post(f"/activities/Soccer%20Team/signup?email={email}")
-        
-        # Check that the email is only in Soccer Team
-        activities_response = client.get("/activities")
+        other_email = "independent2@mergington.edu"
+
+        # Sign up for Soccer Team and, separately, Basketball Club concurrently
+        await asyncio.gather(
+            async_client.post(f"/activities/Soccer%20Team/signup?email={email}"),
+            async_client.post(f"/activities/Basketball%20Club/signup?email={other_email}"),
+        )
+
+        # Check that each email is only in its own activity
+        activities_response = await async_client.get("/activities")
         activities_data = activities_response.json()
-        
+
         assert email in activities_data["Soccer Team"]["participants"]
         assert email not in activities_data["Basketball Club"]["participants"]
         assert email not in activities_data["Drama Club"]["participants"]
-    
+        assert other_email in activities_data["Basketball Club"]["participants"]
+        assert other_email not in activities_data["Soccer Team"]["participants"]
+
     def test_activity_count_after_operations(self, client):
         """Test that activity count remains consistent"""
         initial_response = client.get("/activities")
@@ -241,3 +391,39 @@ class TestDataIntegrity:
         final_count = len(final_response.json())
         
         assert initial_count == final_count
+
+
+class TestStudentActivitiesEndpoint:
+    """Tests for the student activities endpoint"""
+
+    def test_student_activities_follow_signup_and_unregister(self, client):
+        """Test that a student's activities track signups and unregisters"""
+        email = "lookup@mergington.edu"
+        assert client.get(f"/students/{email}/activities").json() == []
+
+        client.post(f"/activities/Soccer%20Team/signup?email={email}")
+        client.post(f"/activities/Chess%20Club/signup?email={email}")
+        response = client.get(f"/students/{email}/activities")
+        assert response.status_code == 200
+        assert response.json() == ["Chess Club", "Soccer Team"]
+
+        client.delete(f"/activities/Soccer%20Team/unregister?email={email}")
+        assert client.get(f"/students/{email}/activities").json() == ["Chess Club"]
+
+    def test_student_activities_existing_participant(self, client):
+        """Test lookup for a student from the initial data"""
+        response = client.get("/students/alex@mergington.edu/activities")
+        assert response.json() == ["Soccer Team"]
+
+    def test_student_activities_normalizes_email(self, client):
+        """Test that lookups normalize the email the same way signups do"""
+        email = "Mixed@Mergington.EDU"
+        client.post(f"/activities/Soccer%20Team/signup?email={email}")
+
+        response = client.get(f"/students/{email}/activities")
+        assert response.json() == ["Soccer Team"]
+
+    def test_student_activities_invalid_email(self, client):
+        """Test that a malformed email is rejected on lookup"""
+        response = client.get("/students/notanemail/activities")
+        assert response.status_code == 422